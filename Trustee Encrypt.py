@@ -19,19 +19,16 @@ Python: 3.8+
 Dependencies: pip install pyzipper
 """
 
-import atexit
-import json
 import os
 import random
+import re
 import secrets
 import string
-import signal
 import sys
 import tempfile
 import time
 import argparse
-from datetime import datetime
-from typing import Dict, List, Optional, Set, Tuple
+from typing import IO, Dict, List, Optional, Set, Tuple
 try:
     import pyzipper
 except ImportError:
@@ -45,34 +42,63 @@ REVEAL_NEEDS_ENTER_DEFAULT = True  # press Enter to clear after viewing
 REVEAL_TIMEOUT_SEC_DEFAULT = False  # set an integer number of seconds for auto-clear
 # ==========================================
 
-TMP_ASSIGN_PATH: Optional[str] = None
+_EXIT_WORDS = frozenset(("exit", "quit"))               # end the reveal session
+_CANCEL_WORDS = frozenset(("cancel", "abort", "back"))  # leave disambiguation
+
+# One name per comma-separated field, surrounding whitespace trimmed, blanks skipped
+_NAME_RE = re.compile(r"\s*([^,\s](?:[^,]*[^,\s])?)\s*(?:,|$)")
+
+# Disambiguation answer: a list number, a cancel word, or an exact name
+_MENU_RE = re.compile(
+    r"\s*(?:(\d+)|(%s)|(\S.*?))\s*$" % "|".join(sorted(_CANCEL_WORDS)),
+    re.IGNORECASE,
+)
+
+TMP_ASSIGN_FILE: Optional[IO[str]] = None  # kept open so the file lives until exit
+ANSI_ENABLED: bool = True  # False on Windows consoles that refuse VT processing
 
 
 def clear_screen_and_scrollback() -> None:
     """Clear current screen AND scrollback/history."""
-    sys.stdout.write("\033[2J\033[H")  # clear visible screen & move cursor home
-    sys.stdout.write("\033[3J")        # clear scrollback
+    if not ANSI_ENABLED:
+        # Legacy Windows console (e.g. Windows 7/8.1 conhost) ignores ANSI
+        try:
+            os.system('cls')
+        except Exception:
+            pass
+        return
+    # clear visible screen & move cursor home, then clear scrollback last so
+    # terminals that save the cleared screen into history lose it too
+    sys.stdout.write("\033[2J\033[H\033[3J")
     sys.stdout.flush()
-    try:
-        os.system('cls' if os.name == 'nt' else 'clear')
-    except Exception:
-        pass
 
 
-def exit_cleanup() -> None:
-    """Remove the temporary assignment file if it exists."""
-    global TMP_ASSIGN_PATH
-    if TMP_ASSIGN_PATH and os.path.exists(TMP_ASSIGN_PATH):
-        try:
-            os.remove(TMP_ASSIGN_PATH)
-        except Exception:
-            pass  # best-effort deletion
+def enable_ansi_escapes() -> bool:
+    """Enable VT escape processing on Windows consoles; return whether ANSI works."""
+    global ANSI_ENABLED
+    if sys.platform != "win32":
+        return ANSI_ENABLED
+    ANSI_ENABLED = False
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+            ANSI_ENABLED = bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        pass  # fall back to 'cls' in clear_screen_and_scrollback
+    return ANSI_ENABLED
 
 
-def install_signal_handlers() -> None:
-    """Ensure Ctrl+C (SIGINT) and SIGTERM trigger a clean exit."""
-    for sig in (signal.SIGINT, signal.SIGTERM):
-        signal.signal(sig, lambda *_: sys.exit(0))
+def disable_input_history() -> None:
+    """Keep typed names out of readline history (and ~/.python_history)."""
+    # Only act if something (python -i, PYTHONSTARTUP) already loaded readline;
+    # importing it here would switch input() over to readline in the first place.
+    readline = sys.modules.get("readline")
+    if readline is not None and hasattr(readline, "set_auto_history"):
+        readline.set_auto_history(False)
 
 
 def show_configuration_menu() -> Tuple[bool, Optional[int], bool]:
@@ -168,14 +194,8 @@ def prompt_names() -> List[str]:
     """Prompt for comma-separated names and return a de-duplicated list."""
     print("Enter all participant names, comma-separated (at least 2):")
     raw = input("> ").strip()
-    names = [n.strip() for n in raw.split(",") if n.strip()]
-
-    seen = set()
-    uniq: List[str] = []
-    for n in names:
-        if n not in seen:
-            seen.add(n)
-            uniq.append(n)
+    # dict.fromkeys drops repeats while keeping first-seen order
+    uniq = list(dict.fromkeys(_NAME_RE.findall(raw)))
 
     if len(uniq) < 2:
         print("Need at least 2 distinct names. Exiting.")
@@ -183,14 +203,51 @@ def prompt_names() -> List[str]:
     return uniq
 
 
-def gen_derangement(names: List[str]) -> Dict[str, str]:
-    """Generate a derangement (no one gifts to themselves) by shuffle-and-check."""
-    givers = names[:]
-    receivers = names[:]
+def prompt_disambiguation(candidates: List[str], choices: Set[str]) -> Optional[str]:
+    """Ask which of several names differing only by case is meant (None if canceled).
+
+    ``choices`` holds the same names as ``candidates`` for O(1) exact-name matches.
+    """
+    print("Multiple participants match that entry:")
+    for idx, candidate in enumerate(candidates, start=1):
+        print(f"  {idx}. {candidate}")
+
     while True:
-        random.shuffle(receivers)
-        if all(g != r for g, r in zip(givers, receivers)):
-            return dict(zip(givers, receivers))
+        m = _MENU_RE.match(input(
+            "Enter the number or exact name (or type 'cancel' to abort): "
+        ))
+        if m is None:
+            print("Please enter a selection.")
+            continue
+
+        number, cancel, selection = m.groups()
+        if cancel:
+            print("Selection canceled. Returning to main prompt.")
+            return None
+
+        if number:
+            idx = int(number)
+            if 1 <= idx <= len(candidates):
+                return candidates[idx - 1]
+            print("Number out of range. Try again.")
+            continue
+
+        if selection in choices:
+            return selection
+
+        print("Input did not match any option. Try again.")
+
+
+def gen_derangement(names: List[str], rng: random.Random) -> Dict[str, str]:
+    """Generate a derangement (no one gifts to themselves) as one gift circle.
+
+    Shuffles the names once and has each person gift to the next one, wrapping
+    around at the end. Every result is valid, so there is no retry loop, and
+    the gift graph is always a single connected cycle.
+    """
+    n = len(names)
+    order = rng.sample(names, n)
+    return {order[i]: order[(i + 1) % n] for i in range(n)}
 
 
 def generate_secure_password(length: int) -> str:
@@ -211,6 +268,8 @@ def create_encrypted_backup(assignments: Dict[str, str], num_participants: int)
     Returns:
         tuple: (zip_file_path, password)
     """
+    from datetime import datetime
+
     # Generate password: 4 * n digits
     password_length = 4 * num_participants
     password = generate_secure_password(password_length)
@@ -221,51 +280,41 @@ def create_encrypted_backup(assignments: Dict[str, str], num_participants: int)
     # Create a timestamp for unique filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Create txt file with assignments (temporary)
-    txt_fd, txt_path = tempfile.mkstemp(prefix="secret_santa_", suffix=".txt")
-    try:
-        with os.fdopen(txt_fd, 'w', encoding='utf-8') as f:
-            f.write("Secret Santa Assignments\n")
-            f.write("=" * 50 + "\n\n")
-            for giver, receiver in sorted(assignments.items()):
-                f.write(f"{giver} -> {receiver}\n")
-        
-        # Create encrypted ZIP file in the script's directory
-        zip_filename = f"secret_santa_{timestamp}.zip"
-        zip_path = os.path.join(script_dir, zip_filename)
-        
-        with pyzipper.AESZipFile(
-            zip_path,
-            'w',
-            compression=pyzipper.ZIP_LZMA,
-            encryption=pyzipper.WZ_AES
-        ) as zf:
-            zf.setpassword(password.encode('utf-8'))
-            # Add the txt file to zip with just the basename
-            zf.write(txt_path, os.path.basename(txt_path))
-        
-        return zip_path, password
+    # Build the assignments text in memory so no plaintext copy ever hits disk
+    lines = ["Secret Santa Assignments", "=" * 50, ""]
+    lines.extend(f"{giver} -> {receiver}" for giver, receiver in sorted(assignments.items()))
+    txt_content = "\n".join(lines) + "\n"
     
-    finally:
-        # Clean up the temporary txt file
-        try:
-            os.remove(txt_path)
-        except Exception:
-            pass
+    # Create encrypted ZIP file in the script's directory
+    zip_filename = f"secret_santa_{timestamp}.zip"
+    zip_path = os.path.join(script_dir, zip_filename)
+    
+    with pyzipper.AESZipFile(
+        zip_path,
+        'w',
+        compression=pyzipper.ZIP_LZMA,
+        encryption=pyzipper.WZ_AES
+    ) as zf:
+        zf.setpassword(password.encode('utf-8'))
+        zf.writestr(f"secret_santa_{timestamp}.txt", txt_content.encode('utf-8'))
+    
+    return zip_path, password
 
 
 def write_tmp_assign(assignments: Dict[str, str]) -> None:
-    """Write assignments to a secure temp file (auto-deleted on exit)."""
-    global TMP_ASSIGN_PATH
-    fd, path = tempfile.mkstemp(prefix="secret_santa_", suffix=".json")
-    os.close(fd)
-    try:
-        os.chmod(path, 0o600)
-    except Exception:
-        pass
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(assignments, f, ensure_ascii=False, indent=2)
-    TMP_ASSIGN_PATH = path
+    """Write assignments to a secure temp file that disappears with the process.
+
+    On POSIX the file is unlinked as soon as it is created and on Windows it is
+    opened delete-on-close, so the OS reclaims it on any exit, even a signal.
+    """
+    global TMP_ASSIGN_FILE
+    f = tempfile.TemporaryFile(
+        mode="w", encoding="utf-8", prefix="secret_santa_", suffix=".tsv"
+    )
+    # One "giver<TAB>receiver" line per pair; write-only, the file has no name
+    f.write("\n".join(f"{g}\t{r}" for g, r in assignments.items()) + "\n")
+    f.flush()
+    TMP_ASSIGN_FILE = f
 
 
 def wait_then_clear(needs_enter: bool, timeout_sec: Optional[int]) -> None:
@@ -304,7 +353,8 @@ def build_arg_parser() -> argparse.ArgumentParser:
         "--seed",
         type=int,
         default=None,
-        help="Set PRNG seed for reproducible assignments (optional).",
+        help="Set PRNG seed for reproducible assignments (optional). "
+             "Disables the cryptographic RNG used by default.",
     )
     parser.add_argument(
         "--no-backup",
@@ -323,6 +373,8 @@ def main() -> None:
     """Main entry point for the Secret Santa Trustee program."""
     parser = build_arg_parser()
     args = parser.parse_args()
+    enable_ansi_escapes()
+    disable_input_history()
 
     # Show configuration menu unless --skip-menu is specified
     if not args.skip_menu and not any([args.no_enter, args.timeout is not None]):
@@ -348,18 +400,15 @@ def main() -> None:
 
     one_shot_reveal = not args.allow_repeat
 
-    # Set random seed if specified
-    if args.seed is not None:
-        random.seed(args.seed)
+    # Assignments are secret, so use the OS CSPRNG unless a seed was requested
+    rng = random.Random(args.seed) if args.seed is not None else secrets.SystemRandom()
 
     clear_screen_and_scrollback()
     print("Secret Santa Trustee")
-    install_signal_handlers()
-    atexit.register(exit_cleanup)
 
     # Get participant names and generate assignments
     names = prompt_names()
-    assignments = gen_derangement(names)
+    assignments = gen_derangement(names, rng)
     write_tmp_assign(assignments)
 
     # Create encrypted backup if enabled
@@ -377,11 +426,19 @@ def main() -> None:
             print(f"\nWarning: Failed to create encrypted backup: {e}")
             time.sleep(2)
 
-    # Build case-insensitive lookup that preserves duplicates differing only by case
-    lc_to_names: Dict[str, List[str]] = {}
+    # Build case-insensitive lookup; names differing only by case go to collisions.
+    # Keys use casefold() rather than lower(), so e.g. "Straße" matches "STRASSE".
+    primary: Dict[str, str] = {}
+    collisions: Dict[str, List[str]] = {}
     for original in names:
-        lc_to_names.setdefault(original.lower(), []).append(original)
-    viewed: Set[str] = set()
+        folded = original.casefold()
+        first = primary.setdefault(folded, original)
+        if first != original:
+            collisions.setdefault(folded, [first]).append(original)
+    # Exact spellings per collision bucket; the lists above keep menu order
+    collision_exact: Dict[str, Set[str]] = {k: set(v) for k, v in collisions.items()}
+    viewed: Dict[str, bool] = dict.fromkeys(names, False)
+    resolved: Dict[str, str] = {}  # exact query -> participant, for repeat entries
 
     # Start private reveal mode
     clear_screen_and_scrollback()
@@ -395,61 +452,33 @@ def main() -> None:
             if not query:
                 print("Please enter a non-empty name.")
                 continue
-            if query.lower() in ("exit", "quit"):
+            key = query.casefold()
+            if key in _EXIT_WORDS:
                 print("Exiting. Temporary file cleaned up. Happy holidays!")
                 return
 
-            key = query.lower()
-            if key not in lc_to_names:
-                print("Name not found. Please re-check spelling and try again.")
-                continue
-
-            candidates = lc_to_names[key]
-            real_name: Optional[str] = None
-
-            # Handle exact match or single candidate
-            if query in candidates:
-                real_name = query
-            elif len(candidates) == 1:
-                real_name = candidates[0]
-            else:
-                # Multiple matches - ask for clarification
-                print("Multiple participants match that entry:")
-                for idx, candidate in enumerate(candidates, start=1):
-                    print(f"  {idx}. {candidate}")
-
-                while True:
-                    selection = input(
-                        "Enter the number or exact name (or type 'cancel' to abort): "
-                    ).strip()
-
-                    if not selection:
-                        print("Please enter a selection.")
-                        continue
-
-                    if selection.lower() in {"cancel", "abort", "back"}:
-                        print("Selection canceled. Returning to main prompt.")
-                        break
-
-                    if selection.isdigit():
-                        idx = int(selection)
-                        if 1 <= idx <= len(candidates):
-                            real_name = candidates[idx - 1]
-                            break
-                        print("Number out of range. Try again.")
-                        continue
-
-                    if selection in candidates:
-                        real_name = selection
-                        break
-
-                    print("Input did not match any option. Try again.")
-
+            # Spellings that resolved unambiguously before skip the lookup
+            real_name = resolved.get(query)
+            if real_name is None:
+                real_name = primary.get(key)
                 if real_name is None:
+                    print("Name not found. Please re-check spelling and try again.")
                     continue
 
+                # Unique names resolve directly; case-collisions need an exact match or a choice
+                candidates = collisions.get(key)
+                if candidates is None:
+                    resolved[query] = real_name
+                elif query in collision_exact[key]:
+                    real_name = resolved[query] = query
+                else:
+                    # Not memoized: the same entry may mean someone else next time
+                    real_name = prompt_disambiguation(candidates, collision_exact[key])
+                    if real_name is None:
+                        continue
+
             # Check if already viewed (one-shot mode)
-            if one_shot_reveal and real_name in viewed:
+            if one_shot_reveal and viewed[real_name]:
                 print("You have already viewed your assignment.")
                 continue
 
@@ -473,7 +502,7 @@ def main() -> None:
                 print("All participants must combine their parts (in order)")
                 print(f"to unlock: {os.path.basename(zip_path)}")
             
-            viewed.add(real_name)
+            viewed[real_name] = True
 
             # Wait and clear screen
             wait_then_clear(reveal_needs_enter, reveal_timeout_sec)
@@ -484,4 +513,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(0)